@@ -1,20 +1,38 @@
+import asyncio
 from html import escape
 import json
 import os
 from pathlib import Path
+import threading
+import time
 
-from fastapi import FastAPI, Query
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Query, Request
+from fastapi.responses import HTMLResponse, StreamingResponse
 
+from kp_news.rollups import (
+    AUTHORS_COLLECTION,
+    KEYWORDS_COLLECTION,
+    daily_counts,
+    top_names,
+)
+from kp_news.storage import LISTING_PROJECTION, attach_texts, bodies_collection_name
 
-def _mongo_collection():
+
+STORAGE_LAYOUT = os.getenv("MONGO_STORAGE_LAYOUT", "inline")
+
+
+def _mongo_db():
     from pymongo import MongoClient
 
     uri = os.getenv("MONGO_URI", "mongodb://localhost:27017")
     db_name = os.getenv("MONGO_DATABASE", "kp_news")
-    coll_name = os.getenv("MONGO_COLLECTION", "articles")
     client = MongoClient(uri, serverSelectionTimeoutMS=4000)
-    db = client[db_name]
+    return client, client[db_name]
+
+
+def _mongo_collection():
+    coll_name = os.getenv("MONGO_COLLECTION", "articles")
+    client, db = _mongo_db()
     return client, db[coll_name]
 
 
@@ -34,6 +52,112 @@ def _sample_docs(limit):
     return docs
 
 
+FEED_FIELDS = ("title", "publication_datetime", "source_url", "authors")
+FEED_POLL_SECONDS = float(os.getenv("FEED_POLL_SECONDS", "2"))
+FEED_KEEPALIVE_SECONDS = 15
+FEED_QUEUE_SIZE = 100
+
+
+def _feed_summary(doc, operation):
+    summary = {key: doc.get(key) for key in FEED_FIELDS}
+    summary["id"] = str(doc.get("_id", ""))
+    summary["operation"] = operation
+    return summary
+
+
+def _offer(queue, event):
+    # Slow clients lose the oldest events instead of stalling the shared cursor.
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+# One upstream Mongo cursor fanned out to every connected SSE client.
+class ArticleFeed:
+    def __init__(self):
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def subscribe(self):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(maxsize=FEED_QUEUE_SIZE))
+        with self.lock:
+            self.subscribers.add(subscriber)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def _has_subscribers(self):
+        with self.lock:
+            return bool(self.subscribers)
+
+    def _keep_running(self):
+        with self.lock:
+            if self.subscribers:
+                return True
+            self.thread = None
+            return False
+
+    def _publish(self, event):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_offer, queue, event)
+
+    def _run(self):
+        from pymongo.errors import OperationFailure
+
+        while self._keep_running():
+            client = None
+            try:
+                client, collection = _mongo_collection()
+                try:
+                    self._watch(collection)
+                except OperationFailure:
+                    # Standalone servers have no change streams.
+                    self._poll(collection)
+            except Exception:
+                time.sleep(FEED_POLL_SECONDS)
+            finally:
+                if client is not None:
+                    client.close()
+
+    def _watch(self, collection):
+        projection = {f"fullDocument.{key}": 1 for key in FEED_FIELDS}
+        projection.update({"operationType": 1, "fullDocument._id": 1})
+        pipeline = [
+            {"$match": {"operationType": {"$in": ["insert", "replace", "update"]}}},
+            {"$project": projection},
+        ]
+        with collection.watch(
+            pipeline, full_document="updateLookup", max_await_time_ms=1000
+        ) as stream:
+            while self._has_subscribers():
+                change = stream.try_next()
+                if change and change.get("fullDocument"):
+                    self._publish(
+                        _feed_summary(change["fullDocument"], change["operationType"])
+                    )
+
+    def _poll(self, collection):
+        projection = {key: 1 for key in FEED_FIELDS}
+        latest = collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        last_id = latest["_id"] if latest else None
+        while self._has_subscribers():
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            for doc in collection.find(query, projection).sort("_id", 1).limit(FEED_QUEUE_SIZE):
+                last_id = doc["_id"]
+                self._publish(_feed_summary(doc, "insert"))
+            time.sleep(FEED_POLL_SECONDS)
+
+
+FEED = ArticleFeed()
+
 app = FastAPI(title="KP News Viewer")
 
 
@@ -42,11 +166,15 @@ def render_articles(n: int = Query(default=10, ge=1, le=500)):
     source_label = "MongoDB"
     try:
         client, collection = _mongo_collection()
+        # The page links the photo by URL, so the base64 copy is never fetched.
         docs = list(
-            collection.find({}, {"_id": 0})
+            collection.find({}, {"_id": 0, "header_photo_base64": 0})
             .sort("publication_datetime", -1)
             .limit(n)
         )
+        if STORAGE_LAYOUT == "split":
+            bodies = collection.database[bodies_collection_name(collection.name)]
+            attach_texts(bodies, docs)
     except Exception as exc:
         docs = _sample_docs(n)
         source_label = f"sample.jsonl fallback ({escape(str(exc))})"
@@ -93,3 +221,100 @@ def render_articles(n: int = Query(default=10, ge=1, le=500)):
         + "</body></html>"
     )
     return HTMLResponse(content=body)
+
+
+@app.get("/articles")
+def list_articles(
+    limit: int = Query(default=50, ge=1, le=500),
+    before: str = Query(default=""),
+    before_url: str = Query(default=""),
+    author: str = Query(default=""),
+    keyword: str = Query(default=""),
+):
+    query = {}
+    if before and before_url:
+        # Articles published in the same second are ordered by source_url, so
+        # a page boundary inside such a group neither skips nor repeats items.
+        query["$or"] = [
+            {"publication_datetime": {"$lt": before}},
+            {"publication_datetime": before, "source_url": {"$lt": before_url}},
+        ]
+    elif before:
+        query["publication_datetime"] = {"$lt": before}
+    if author:
+        query["authors"] = author
+    if keyword:
+        query["keywords"] = keyword
+    client, collection = _mongo_collection()
+    try:
+        items = list(
+            collection.find(query, LISTING_PROJECTION)
+            .sort([("publication_datetime", -1), ("source_url", -1)])
+            .limit(limit)
+        )
+    finally:
+        client.close()
+    next_before = next_before_url = None
+    if len(items) == limit:
+        next_before = items[-1]["publication_datetime"]
+        next_before_url = items[-1]["source_url"]
+    return {"items": items, "next_before": next_before, "next_before_url": next_before_url}
+
+
+def _rollup_response(query):
+    client, db = _mongo_db()
+    try:
+        return query(db)
+    finally:
+        client.close()
+
+
+@app.get("/stats/daily")
+def stats_daily(days: int = Query(default=30, ge=1, le=366)):
+    return {"days": days, "items": _rollup_response(lambda db: daily_counts(db, days))}
+
+
+@app.get("/stats/authors")
+def stats_authors(
+    days: int = Query(default=7, ge=1, le=366),
+    limit: int = Query(default=10, ge=1, le=100),
+):
+    items = _rollup_response(lambda db: top_names(db, AUTHORS_COLLECTION, days, limit))
+    return {"days": days, "items": items}
+
+
+@app.get("/stats/keywords")
+def stats_keywords(
+    days: int = Query(default=7, ge=1, le=366),
+    limit: int = Query(default=20, ge=1, le=100),
+):
+    items = _rollup_response(lambda db: top_names(db, KEYWORDS_COLLECTION, days, limit))
+    return {"days": days, "items": items}
+
+
+async def _feed_events(request):
+    # Subscribe only once the generator runs: a client that drops before
+    # streaming starts never registers, and every registration is paired
+    # with the unsubscribe in the finally block below.
+    subscriber = FEED.subscribe()
+    _, queue = subscriber
+    try:
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=FEED_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            data = json.dumps(event, ensure_ascii=False, default=str)
+            yield f"id: {event['id']}\nevent: article\ndata: {data}\n\n"
+    finally:
+        FEED.unsubscribe(subscriber)
+
+
+@app.get("/feed")
+async def article_feed(request: Request):
+    return StreamingResponse(
+        _feed_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
@@ -0,0 +1,139 @@
+from array import array
+import json
+import mmap
+from pathlib import Path
+
+
+INDEX_SUFFIX = ".idx"
+INDEX_MAGIC = "kp-jsonl-index-v3"
+
+
+def index_path_for(path: Path):
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def _file_stamp(path: Path):
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def is_record_start(raw: bytes):
+    # Cheap byte test shared by the index and the sequential reader: a line is
+    # a record slot when it starts with "{", readable JSON or not.
+    return raw[:64].lstrip(b" \t\r\x00")[:1] == b"{"
+
+
+def parse_record(raw: bytes):
+    text = raw.decode("utf-8", errors="ignore").strip().lstrip("\x00")
+    if not text.startswith("{"):
+        return None
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+
+def iter_numbered(path: Path):
+    # Numbers every record slot the way JsonlIndex does and skips the ones
+    # that fail to parse, so #N means the same record in every mode.
+    number = 0
+    with path.open("rb") as file:
+        for line in file:
+            if not is_record_start(line):
+                continue
+            number += 1
+            record = parse_record(line)
+            if record is not None:
+                yield number, record
+
+
+def scan_offsets(buffer):
+    offsets = array("Q")
+    size = len(buffer)
+    position = 0
+    while position < size:
+        end = buffer.find(b"\n", position)
+        if end == -1:
+            end = size
+        if is_record_start(buffer[position:min(end, position + 64)]):
+            offsets.append(position)
+        position = end + 1
+    return offsets
+
+
+def _load_index(index_path: Path, stamp):
+    try:
+        with index_path.open("rb") as file:
+            header = json.loads(file.readline())
+            if header.get("magic") != INDEX_MAGIC or header.get("stamp") != stamp:
+                return None
+            offsets = array("Q")
+            offsets.frombytes(file.read())
+    except (OSError, ValueError):
+        return None
+    if len(offsets) != header.get("count"):
+        return None
+    return offsets
+
+
+def _save_index(index_path: Path, stamp, offsets):
+    header = {"magic": INDEX_MAGIC, "stamp": stamp, "count": len(offsets)}
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    try:
+        with tmp_path.open("wb") as file:
+            file.write(json.dumps(header).encode("ascii") + b"\n")
+            offsets.tofile(file)
+        tmp_path.replace(index_path)
+    except OSError:
+        # Read-only directories still get an in-memory index.
+        tmp_path.unlink(missing_ok=True)
+
+
+class JsonlIndex:
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = path.open("rb")
+        stamp = _file_stamp(path)
+        if stamp["size"] == 0:
+            self.buffer = b""
+            self.offsets = array("Q")
+            return
+
+        self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        index_path = index_path_for(path)
+        offsets = _load_index(index_path, stamp)
+        if offsets is None:
+            offsets = scan_offsets(self.buffer)
+            _save_index(index_path, stamp, offsets)
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self._file.close()
+
+    def raw(self, index):
+        start = self.offsets[index]
+        end = self.buffer.find(b"\n", start)
+        if end == -1:
+            end = len(self.buffer)
+        return self.buffer[start:end]
+
+    def record(self, index):
+        return parse_record(self.raw(index))
+
+    def iter_records(self, start=0, stop=None):
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(max(start, 0), stop):
+            record = self.record(index)
+            if record is not None:
+                yield index, record
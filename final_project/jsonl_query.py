@@ -0,0 +1,145 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import json
+import mmap
+import os
+from pathlib import Path
+import re
+
+from jsonl_index import is_record_start, parse_record
+
+
+PREDICATE_RE = re.compile(r"^(\w+)(=~|>=|<=|~|@|\?)(.*)$")
+
+
+class Predicate:
+    def __init__(self, spec: str):
+        match = PREDICATE_RE.match(spec)
+        if not match:
+            raise ValueError(f"invalid predicate: {spec}")
+        self.field, self.op, self.arg = match.groups()
+        self.regex = re.compile(self.arg) if self.op == "=~" else None
+        self.members = {v.strip() for v in self.arg.split(",") if v.strip()}
+        if self.op == "?" and self.arg not in ("empty", "nonempty"):
+            raise ValueError(f"expected empty or nonempty: {spec}")
+        # Byte needles that every matching line must contain, either raw
+        # UTF-8 or as written by json.dumps with ensure_ascii=True. A missing
+        # field reads as empty, so ?empty and =~ (which may match "") can't
+        # require the key to be present.
+        self.needles = []
+        if self.op in ("~", "@", ">=", "<=") or (self.op == "?" and self.arg == "nonempty"):
+            self.needles.append(self._needle_variants(f'"{self.field}"'))
+        if self.op == "~":
+            self.needles.append(self._needle_variants(self.arg))
+        elif self.op == "@":
+            self.needles.append(
+                [variant for member in self.members for variant in self._needle_variants(member)]
+            )
+
+    @staticmethod
+    def _needle_variants(text):
+        variants = {text.encode("utf-8"), json.dumps(text)[1:-1].encode("ascii")}
+        return list(variants)
+
+    def may_match(self, raw: bytes):
+        return all(any(needle in raw for needle in group) for group in self.needles)
+
+    def matches(self, record: dict):
+        value = record.get(self.field)
+        values = value if isinstance(value, list) else [value]
+        values = ["" if v is None else str(v) for v in values]
+        if self.op == "?":
+            empty = not any(values)
+            return empty if self.arg == "empty" else not empty
+        if self.op == "~":
+            return any(self.arg in v for v in values)
+        if self.op == "=~":
+            return any(self.regex.search(v) for v in values)
+        if self.op == "@":
+            return any(v in self.members for v in values)
+        if self.op == ">=":
+            return any(v and v[:len(self.arg)] >= self.arg for v in values)
+        return any(v and v[:len(self.arg)] <= self.arg for v in values)
+
+
+MIN_CHUNK_BYTES = 1 << 20
+
+
+def _chunk_bounds(buffer, chunks):
+    size = len(buffer)
+    step = max(size // max(chunks, 1), MIN_CHUNK_BYTES)
+    bounds = []
+    start = 0
+    while start < size:
+        end = buffer.find(b"\n", min(start + step, size))
+        end = size if end == -1 else end + 1
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _scan_chunk(path, start, end, predicate_specs, stats_fields, keep, project):
+    predicates = [Predicate(spec) for spec in predicate_specs]
+    records = 0
+    matched = 0
+    kept = []
+    counters = {field: Counter() for field in stats_fields}
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        position = start
+        while position < end:
+            line_end = buffer.find(b"\n", position, end)
+            if line_end == -1:
+                line_end = end
+            raw = buffer[position:line_end]
+            position = line_end + 1
+            # Record slots are counted with the index's own test, so the
+            # numbers match --offset/--range without building the index.
+            if not is_record_start(raw):
+                continue
+            records += 1
+            if not all(p.may_match(raw) for p in predicates):
+                continue
+            record = parse_record(raw)
+            if record is None or not all(p.matches(record) for p in predicates):
+                continue
+            matched += 1
+            for field, counter in counters.items():
+                value = record.get(field)
+                counter.update(value if isinstance(value, list) else [value])
+            if len(kept) < keep:
+                kept.append((records, project(record)))
+    return records, matched, kept, counters
+
+
+def run_query(path: Path, predicate_specs, stats_fields=(), keep=10, project=dict, workers=None):
+    for spec in predicate_specs:
+        Predicate(spec)
+    if path.stat().st_size == 0:
+        return 0, [], {field: Counter() for field in stats_fields}
+
+    workers = workers or os.cpu_count() or 1
+    with path.open("rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        bounds = _chunk_bounds(buffer, workers * 4)
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(bounds))) as pool:
+        futures = [
+            pool.submit(
+                _scan_chunk, str(path), start, end, predicate_specs, stats_fields, keep, project
+            )
+            for start, end in bounds
+        ]
+        results = [future.result() for future in futures]
+
+    total_matched = 0
+    kept = []
+    counters = {field: Counter() for field in stats_fields}
+    record_base = 0
+    for records, matched, chunk_kept, chunk_counters in results:
+        total_matched += matched
+        for local_number, record in chunk_kept:
+            if len(kept) < keep:
+                kept.append((record_base + local_number, record))
+        for field, counter in chunk_counters.items():
+            counters[field].update(counter)
+        record_base += records
+    return total_matched, kept, counters
@@ -0,0 +1,37 @@
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+
+
+class HtmlArchive:
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def path_for(self, url):
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        # Two-level fan-out keeps directories small on large archives.
+        return self.directory / digest[:2] / f"{digest}.json.gz"
+
+    def save(self, url, body: bytes, encoding="utf-8", status=200):
+        path = self.path_for(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "url": url,
+            "status": status,
+            "encoding": encoding,
+            "body": body.decode(encoding, errors="replace"),
+        }
+        tmp_path = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8", compresslevel=6) as file:
+            json.dump(record, file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def iter_paths(self):
+        return sorted(self.directory.glob("*/*.json.gz"))
+
+    @staticmethod
+    def load(path):
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            return json.load(file)
@@ -0,0 +1,47 @@
+import sqlite3
+import time
+import zlib
+
+
+class RevalidationStore:
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                encoding TEXT,
+                body BLOB,
+                stored_at REAL
+            )
+            """
+        )
+
+    def validators(self, url):
+        row = self.conn.execute(
+            "SELECT etag, last_modified FROM entries WHERE url = ?", (url,)
+        ).fetchone()
+        return row
+
+    def load(self, url):
+        row = self.conn.execute(
+            "SELECT encoding, body FROM entries WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        encoding, body = row
+        return encoding, zlib.decompress(body)
+
+    def store(self, url, etag, last_modified, encoding, body: bytes):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(url, etag, last_modified, encoding, body, stored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, encoding, zlib.compress(body, 6), time.time()),
+            )
+
+    def close(self):
+        self.conn.close()
@@ -14,3 +14,4 @@ class KpNewsItem(scrapy.Item):
     # Optional fields
     header_photo_url = scrapy.Field()
     header_photo_base64 = scrapy.Field()
+    duplicate_of = scrapy.Field()
@@ -0,0 +1,128 @@
+from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import HtmlResponse
+
+from kp_news.httpcache import RevalidationStore
+
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+class EvictedArticleMiddleware:
+    def __init__(self, stats):
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.stats)
+
+    def process_request(self, request, spider):
+        scheduler = getattr(spider, "recency_scheduler", None)
+        if scheduler is None or not request.meta.get("kp_article"):
+            return None
+        if request.url in scheduler.evicted:
+            # Newer URLs filled the budget after this one was queued.
+            self.stats.inc_value("recency/evicted_skipped")
+            raise IgnoreRequest(f"Evicted by newer articles: {request.url}")
+        # From here on the download spends budget and can no longer be evicted.
+        scheduler.mark_done(request.url)
+        return None
+
+
+class RevalidationCacheMiddleware:
+    # Known article URLs are revalidated with a plain conditional GET instead
+    # of a Playwright render; a 304 is answered from the stored body.
+
+    def __init__(self, store, stats):
+        self.store = store
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("HTTP_REVALIDATION_CACHE_PATH")
+        if not path:
+            raise NotConfigured
+        middleware = cls(RevalidationStore(path), crawler.stats)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_closed(self, spider):
+        spider.logger.info(
+            "HTTP revalidation cache: %s hits, %s misses, %s uncached, %s stored, "
+            "%s bytes saved",
+            self.stats.get_value("revalidation/hit", 0),
+            self.stats.get_value("revalidation/miss", 0),
+            self.stats.get_value("revalidation/uncached", 0),
+            self.stats.get_value("revalidation/stored", 0),
+            self.stats.get_value("revalidation/bytes_saved", 0),
+        )
+        self.store.close()
+
+    def process_request(self, request, spider):
+        meta = request.meta
+        if not meta.get("kp_article") or meta.get("kp_revalidate") or meta.get("kp_refetch"):
+            return None
+        validators = self.store.validators(request.url)
+        if validators is None:
+            # First visit, or the server sent no validators last time.
+            self.stats.inc_value("revalidation/uncached")
+            return None
+
+        etag, last_modified = validators
+        headers = request.headers.copy()
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        new_meta = dict(meta)
+        new_meta["kp_render"] = bool(meta.get("playwright"))
+        new_meta["playwright"] = False
+        new_meta["kp_revalidate"] = True
+        return request.replace(headers=headers, meta=new_meta, dont_filter=True)
+
+    def process_response(self, request, response, spider):
+        meta = request.meta
+        if not meta.get("kp_article"):
+            return response
+
+        if meta.get("kp_revalidate"):
+            if response.status == 304:
+                cached = self.store.load(request.url)
+                if cached is not None:
+                    encoding, body = cached
+                    self.stats.inc_value("revalidation/hit")
+                    self.stats.inc_value("revalidation/bytes_saved", len(body))
+                    return HtmlResponse(
+                        url=request.url,
+                        body=body,
+                        encoding=encoding,
+                        request=request,
+                        flags=["revalidated"],
+                    )
+            self.stats.inc_value("revalidation/miss")
+            if response.status != 200 or meta.get("kp_render"):
+                return self._refetch(request)
+
+        if response.status == 200:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                self.store.store(
+                    request.url,
+                    etag.decode("latin-1") if etag else None,
+                    last_modified.decode("latin-1") if last_modified else None,
+                    getattr(response, "encoding", "utf-8"),
+                    response.body,
+                )
+                self.stats.inc_value("revalidation/stored")
+        return response
+
+    def _refetch(self, request):
+        # The page changed: fetch it again the way it was originally requested.
+        headers = request.headers.copy()
+        for name in CONDITIONAL_HEADERS:
+            headers.pop(name, None)
+        meta = dict(request.meta)
+        meta["playwright"] = meta.pop("kp_render", False)
+        meta.pop("kp_revalidate", None)
+        meta["kp_refetch"] = True
+        return request.replace(headers=headers, meta=meta, dont_filter=True)
@@ -5,6 +5,15 @@ from datetime import datetime, timezone
 from itemadapter import ItemAdapter
 from scrapy.exceptions import DropItem
 
+from kp_news.dedup import SimHashIndex, simhash, text_words
+from kp_news.rollups import ROLLUP_PROJECTION, apply_rollups, ensure_rollup_indexes
+from kp_news.storage import (
+    LAYOUTS,
+    bodies_collection_name,
+    ensure_listing_indexes,
+    split_document,
+)
+
 
 REQUIRED_FIELDS = (
     "title",
@@ -79,6 +88,54 @@ class ValidationAndNormalizePipeline:
         return item
 
 
+class NearDuplicatePipeline:
+    def __init__(self, index_path, max_distance, mode, min_words):
+        self.index_path = index_path
+        self.max_distance = max_distance
+        self.mode = mode
+        self.min_words = min_words
+        self.index = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        mode = crawler.settings.get("DEDUP_MODE", "drop")
+        if mode not in ("drop", "link"):
+            raise ValueError(f"DEDUP_MODE must be 'drop' or 'link', got {mode!r}")
+        return cls(
+            index_path=crawler.settings.get("DEDUP_INDEX_PATH", "dedup_index.sqlite3"),
+            max_distance=crawler.settings.getint("DEDUP_MAX_DISTANCE", 11),
+            mode=mode,
+            min_words=crawler.settings.getint("DEDUP_MIN_WORDS", 30),
+        )
+
+    def open_spider(self, spider):
+        self.index = SimHashIndex(self.index_path, self.max_distance)
+
+    def close_spider(self, spider):
+        if self.index is not None:
+            self.index.close()
+
+    def process_item(self, item, spider):
+        adapter = ItemAdapter(item)
+        words = text_words(adapter.get("article_text"))
+        # Fallback bodies (title or description only) are too short to compare.
+        if len(words) < self.min_words:
+            return item
+
+        source_url = adapter.get("source_url")
+        signature = simhash(words)
+        canonical_url = self.index.find_duplicate(source_url, signature)
+        if canonical_url is None:
+            self.index.add(source_url, signature)
+            return item
+
+        spider.crawler.stats.inc_value(f"dedup/{self.mode}")
+        if self.mode == "drop":
+            raise DropItem(f"Near-duplicate of {canonical_url}: {source_url}")
+        adapter["duplicate_of"] = canonical_url
+        return item
+
+
 class PhotoDownloaderPipeline:
     def __init__(self, timeout_seconds, max_bytes):
         self.timeout_seconds = timeout_seconds
@@ -94,7 +151,7 @@ class PhotoDownloaderPipeline:
     def process_item(self, item, spider):
         adapter = ItemAdapter(item)
         photo_url = adapter.get("header_photo_url")
-        if not photo_url:
+        if not photo_url or adapter.get("duplicate_of"):
             return item
 
         try:
@@ -119,12 +176,20 @@ class PhotoDownloaderPipeline:
 
 
 class MongoPipeline:
-    def __init__(self, mongo_uri, mongo_db, mongo_collection):
+    def __init__(
+        self, mongo_uri, mongo_db, mongo_collection, rollups_enabled=True, storage_layout="inline"
+    ):
+        if storage_layout not in LAYOUTS:
+            raise ValueError(f"MONGO_STORAGE_LAYOUT must be one of {LAYOUTS}, got {storage_layout!r}")
         self.mongo_uri = mongo_uri
         self.mongo_db = mongo_db
         self.mongo_collection = mongo_collection
+        self.rollups_enabled = rollups_enabled
+        self.storage_layout = storage_layout
         self.client = None
+        self.db = None
         self.collection = None
+        self.bodies = None
 
     @classmethod
     def from_crawler(cls, crawler):
@@ -132,6 +197,8 @@ class MongoPipeline:
             mongo_uri=crawler.settings.get("MONGO_URI", "mongodb://localhost:27017"),
             mongo_db=crawler.settings.get("MONGO_DATABASE", "kp_news"),
             mongo_collection=crawler.settings.get("MONGO_COLLECTION", "articles"),
+            rollups_enabled=crawler.settings.getbool("MONGO_ROLLUPS_ENABLED", True),
+            storage_layout=crawler.settings.get("MONGO_STORAGE_LAYOUT", "inline"),
         )
 
     def open_spider(self, spider):
@@ -144,10 +211,15 @@ class MongoPipeline:
         try:
             self.client = MongoClient(self.mongo_uri, serverSelectionTimeoutMS=5000)
             self.client.admin.command("ping")
-            db = self.client[self.mongo_db]
-            self.collection = db[self.mongo_collection]
+            self.db = self.client[self.mongo_db]
+            self.collection = self.db[self.mongo_collection]
             self.collection.create_index("source_url", unique=True)
             self.collection.create_index("publication_datetime")
+            if self.rollups_enabled:
+                ensure_rollup_indexes(self.db)
+            ensure_listing_indexes(self.collection)
+            if self.storage_layout == "split":
+                self.bodies = self.db[bodies_collection_name(self.mongo_collection)]
         except Exception as exc:
             spider.logger.warning("MongoDB unavailable, writes disabled: %s", exc)
             self.collection = None
@@ -165,8 +237,42 @@ class MongoPipeline:
         if not source_url:
             return item
 
+        duplicate_of = data.get("duplicate_of")
+        if duplicate_of:
+            try:
+                self.collection.update_one(
+                    {"source_url": duplicate_of},
+                    {"$addToSet": {"alternate_urls": source_url}},
+                )
+            except Exception as exc:
+                spider.logger.warning("Mongo link error for %s: %s", source_url, exc)
+            return item
+
         try:
-            self.collection.replace_one({"source_url": source_url}, data, upsert=True)
+            document = data
+            if self.bodies is not None:
+                # Body first, so a lean document never points at a missing body.
+                document, body = split_document(data)
+                self.bodies.replace_one({"_id": source_url}, body, upsert=True)
+            # $set rather than a full replace: fields the crawl does not own,
+            # such as link-mode alternate_urls, survive a re-crawl.
+            if not self.rollups_enabled:
+                self.collection.update_one(
+                    {"source_url": source_url}, {"$set": document}, upsert=True
+                )
+                return item
+            previous = self.collection.find_one_and_update(
+                {"source_url": source_url},
+                {"$set": document},
+                projection=ROLLUP_PROJECTION,
+                upsert=True,
+            )
         except Exception as exc:
             spider.logger.warning("Mongo write error for %s: %s", source_url, exc)
+            return item
+
+        try:
+            apply_rollups(self.db, previous, data)
+        except Exception as exc:
+            spider.logger.warning("Rollup update error for %s: %s", source_url, exc)
         return item
@@ -0,0 +1,130 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+
+DAILY_COLLECTION = "rollup_daily"
+AUTHORS_COLLECTION = "rollup_authors_daily"
+KEYWORDS_COLLECTION = "rollup_keywords_daily"
+
+ROLLUP_PROJECTION = {"_id": 0, "publication_datetime": 1, "authors": 1, "keywords": 1}
+
+_DAY_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})")
+
+
+def day_key(publication_datetime):
+    match = _DAY_RE.match(str(publication_datetime or ""))
+    return match.group(1) if match else None
+
+
+def since_day(days):
+    today = datetime.now(timezone.utc).date()
+    return (today - timedelta(days=max(days, 1) - 1)).isoformat()
+
+
+def ensure_rollup_indexes(db, suffix=""):
+    db[AUTHORS_COLLECTION + suffix].create_index([("day", 1), ("name", 1)], unique=True)
+    db[KEYWORDS_COLLECTION + suffix].create_index([("day", 1), ("name", 1)], unique=True)
+
+
+def _rollup_ops(doc, delta):
+    from pymongo import UpdateOne
+
+    day = day_key(doc.get("publication_datetime"))
+    if day is None:
+        return {}
+
+    ops = {DAILY_COLLECTION: [UpdateOne({"_id": day}, {"$inc": {"count": delta}}, upsert=True)]}
+    for coll_name, field in ((AUTHORS_COLLECTION, "authors"), (KEYWORDS_COLLECTION, "keywords")):
+        ops[coll_name] = [
+            UpdateOne({"day": day, "name": name}, {"$inc": {"count": delta}}, upsert=True)
+            for name in dict.fromkeys(doc.get(field) or [])
+        ]
+    return ops
+
+
+def apply_rollups(db, old_doc, new_doc):
+    # Counting a removed version with -1 and the stored one with +1 keeps
+    # re-crawled articles from being counted twice.
+    pending = {}
+    if old_doc:
+        for coll_name, ops in _rollup_ops(old_doc, -1).items():
+            pending.setdefault(coll_name, []).extend(ops)
+    if new_doc:
+        for coll_name, ops in _rollup_ops(new_doc, 1).items():
+            pending.setdefault(coll_name, []).extend(ops)
+
+    for coll_name, ops in pending.items():
+        if ops:
+            db[coll_name].bulk_write(ops, ordered=False)
+
+    if old_doc:
+        _delete_emptied(db, old_doc)
+
+
+def _delete_emptied(db, old_doc):
+    # Only the keys just decremented can have dropped to zero; both lookups
+    # hit the _id or the unique (day, name) index.
+    day = day_key(old_doc.get("publication_datetime"))
+    if day is None:
+        return
+    db[DAILY_COLLECTION].delete_one({"_id": day, "count": {"$lte": 0}})
+    for coll_name, field in ((AUTHORS_COLLECTION, "authors"), (KEYWORDS_COLLECTION, "keywords")):
+        names = list(dict.fromkeys(old_doc.get(field) or []))
+        if names:
+            db[coll_name].delete_many(
+                {"day": day, "name": {"$in": names}, "count": {"$lte": 0}}
+            )
+
+
+def rebuild_rollups(db, collection):
+    # Recompute into side collections and swap them in with a rename, so
+    # /stats/* keeps serving the old numbers while the rebuild runs.
+    suffix = "_rebuild"
+    for coll_name in (DAILY_COLLECTION, AUTHORS_COLLECTION, KEYWORDS_COLLECTION):
+        db[coll_name + suffix].drop()
+    ensure_rollup_indexes(db, suffix)
+
+    day_expr = {"$substrBytes": ["$publication_datetime", 0, 10]}
+    day_match = {"publication_datetime": {"$regex": r"^\d{4}-\d{2}-\d{2}"}}
+
+    collection.aggregate(
+        [
+            {"$match": day_match},
+            {"$group": {"_id": day_expr, "count": {"$sum": 1}}},
+            {"$out": DAILY_COLLECTION + suffix},
+        ]
+    )
+    for coll_name, field in ((AUTHORS_COLLECTION, "authors"), (KEYWORDS_COLLECTION, "keywords")):
+        collection.aggregate(
+            [
+                {"$match": day_match},
+                {"$project": {"day": day_expr, "names": {"$setUnion": [f"${field}", []]}}},
+                {"$unwind": "$names"},
+                {"$group": {"_id": {"day": "$day", "name": "$names"}, "count": {"$sum": 1}}},
+                {"$project": {"_id": 0, "day": "$_id.day", "name": "$_id.name", "count": 1}},
+                {"$merge": {"into": coll_name + suffix, "on": ["day", "name"]}},
+            ]
+        )
+
+    for coll_name in (DAILY_COLLECTION, AUTHORS_COLLECTION, KEYWORDS_COLLECTION):
+        # $out creates nothing when there are no dated articles.
+        if coll_name + suffix in db.list_collection_names():
+            db[coll_name + suffix].rename(coll_name, dropTarget=True)
+        else:
+            db[coll_name].delete_many({})
+    ensure_rollup_indexes(db)
+
+
+def daily_counts(db, days):
+    cursor = db[DAILY_COLLECTION].find({"_id": {"$gte": since_day(days)}}).sort("_id", 1)
+    return [{"day": doc["_id"], "count": doc["count"]} for doc in cursor]
+
+
+def top_names(db, coll_name, days, limit):
+    pipeline = [
+        {"$match": {"day": {"$gte": since_day(days)}}},
+        {"$group": {"_id": "$name", "count": {"$sum": "$count"}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": limit},
+    ]
+    return [{"name": doc["_id"], "count": doc["count"]} for doc in db[coll_name].aggregate(pipeline)]
@@ -0,0 +1,89 @@
+from datetime import date
+import heapq
+import re
+
+
+ONLINE_NEWS_RE = re.compile(r"/online/news/(\d+)/")
+DAILY_RE = re.compile(r"/daily/(\d{2})\.(\d{2})\.(\d{4})/(\d+)")
+
+
+class RecencyScheduler:
+    # Spends a budget of `budget` article downloads on the newest URLs seen so
+    # far. URLs still waiting for download sit in a min-heap keyed by
+    # estimated publication hour; once a request starts downloading it is
+    # marked done and counts against the budget for good. When the budget is
+    # spent, a new URL can only displace the oldest pending one, which is
+    # marked evicted so its queued request is skipped before it is rendered.
+
+    def __init__(self, budget, news_ids_per_day, today=None):
+        self.budget = budget
+        self.news_ids_per_day = max(news_ids_per_day, 1)
+        self.today_ordinal = (today or date.today()).toordinal()
+        self.anchor_news_id = None
+        self.heap = []
+        self.pending = set()
+        self.done = 0
+        self.evicted = set()
+
+    def __len__(self):
+        return self.done + len(self.pending)
+
+    def score(self, url):
+        match = DAILY_RE.search(url)
+        if match:
+            day, month, year = (int(part) for part in match.groups()[:3])
+            try:
+                return date(year, month, day).toordinal() * 24
+            except ValueError:
+                return 0
+
+        match = ONLINE_NEWS_RE.search(url)
+        if match:
+            news_id = int(match.group(1))
+            # The first id seen comes from the /online/ feed, i.e. today.
+            if self.anchor_news_id is None:
+                self.anchor_news_id = news_id
+            days_ago = (self.anchor_news_id - news_id) / self.news_ids_per_day
+            return int((self.today_ordinal - days_ago) * 24)
+
+        # Theme pages and anything else without a date go last.
+        return 0
+
+    def _oldest_pending(self):
+        # Done URLs leave the heap lazily.
+        while self.heap and self.heap[0][1] not in self.pending:
+            heapq.heappop(self.heap)
+        return self.heap[0] if self.heap else None
+
+    def is_full(self):
+        return len(self) >= self.budget
+
+    def offer(self, url):
+        if self.budget <= 0:
+            return None
+        score = self.score(url)
+        if not self.is_full():
+            heapq.heappush(self.heap, (score, url))
+            self.pending.add(url)
+            return score
+        oldest = self._oldest_pending()
+        if oldest is None or score <= oldest[0]:
+            return None
+        _, evicted_url = heapq.heapreplace(self.heap, (score, url))
+        self.pending.discard(evicted_url)
+        self.pending.add(url)
+        self.evicted.add(evicted_url)
+        return score
+
+    def mark_done(self, url):
+        if url in self.pending:
+            self.pending.discard(url)
+            self.done += 1
+
+    def should_expand(self, url):
+        # Links on a page older than every pending URL are unlikely to be
+        # newer than what is already queued.
+        if not self.is_full():
+            return True
+        oldest = self._oldest_pending()
+        return oldest is not None and self.score(url) >= oldest[0]
@@ -16,6 +16,19 @@ CONCURRENT_REQUESTS_PER_DOMAIN = 1
 DOWNLOAD_DELAY = 1.0
 
 MAX_ARTICLES = 1000
+# Approximate number of /online/news/<id>/ ids kp.ru allocates per day; used
+# to place news ids and /daily/<date>/ URLs on one recency scale.
+CRAWL_NEWS_IDS_PER_DAY = 400
+
+DOWNLOADER_MIDDLEWARES = {
+    "kp_news.middlewares.EvictedArticleMiddleware": 50,
+    # After RobotsTxtMiddleware (100), so disallowed URLs are dropped first, and
+    # below HttpCompressionMiddleware (590) so stored bodies are decompressed.
+    "kp_news.middlewares.RevalidationCacheMiddleware": 120,
+}
+# SQLite file with ETag/Last-Modified and compressed bodies of article pages;
+# empty disables conditional revalidation on re-crawls.
+HTTP_REVALIDATION_CACHE_PATH = "http_cache.sqlite3"
 
 TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
 DOWNLOAD_HANDLERS = {
@@ -32,6 +45,7 @@ USE_PLAYWRIGHT_REQUESTS = True
 
 ITEM_PIPELINES = {
     "kp_news.pipelines.ValidationAndNormalizePipeline": 100,
+    "kp_news.pipelines.NearDuplicatePipeline": 150,
     "kp_news.pipelines.PhotoDownloaderPipeline": 200,
     "kp_news.pipelines.MongoPipeline": 300,
 }
@@ -39,8 +53,24 @@ ITEM_PIPELINES = {
 MONGO_URI = "mongodb://localhost:27017"
 MONGO_DATABASE = "kp_news"
 MONGO_COLLECTION = "articles"
+MONGO_ROLLUPS_ENABLED = True
+# "inline" keeps whole articles in one document; "split" stores a lean listing
+# document plus zlib-compressed text and raw photo bytes in <collection>_bodies.
+# Convert existing data with migrate_storage.py.
+MONGO_STORAGE_LAYOUT = "inline"
+
+# Near-duplicate detection: "drop" discards copies, "link" records the copy's
+# URL in the canonical document's alternate_urls.
+DEDUP_MODE = "drop"
+DEDUP_INDEX_PATH = "dedup_index.sqlite3"
+DEDUP_MAX_DISTANCE = 11
+DEDUP_MIN_WORDS = 30
 
 PHOTO_DOWNLOAD_TIMEOUT_SECONDS = 8
 PHOTO_DOWNLOAD_MAX_BYTES = 5_000_000
 
+# Directory for gzip-compressed raw article HTML; empty disables archiving.
+# reextract_archive.py replays it through extraction without re-crawling.
+HTML_ARCHIVE_DIR = ""
+
 FEED_EXPORT_ENCODING = "utf-8"
@@ -3,7 +3,9 @@ from urllib.parse import urljoin
 
 import scrapy
 
+from kp_news.archive import HtmlArchive
 from kp_news.items import KpNewsItem
+from kp_news.scheduling import RecencyScheduler
 
 
 def clean_text(value):
@@ -16,6 +18,106 @@ def clean_join(values):
     return clean_text(" ".join(v for v in values if clean_text(v)))
 
 
+def extract_article(response):
+    title = clean_text(
+        response.xpath(
+            "//h1/text() | //meta[@property='og:title']/@content | //title/text()"
+        ).get()
+    )
+
+    description = clean_text(
+        response.xpath(
+            "//meta[@name='description']/@content | "
+            "//meta[@property='og:description']/@content"
+        ).get()
+    )
+
+    article_text_nodes = response.xpath(
+        "//div[@data-gtm-el='content-body']//p//text() | "
+        "//div[contains(@class,'article__text')]//p//text() | "
+        "//div[contains(@class,'article-content')]//p//text() | "
+        "//article//p//text()"
+    ).getall()
+    article_text = clean_join(article_text_nodes)
+
+    publication_datetime = clean_text(
+        response.xpath(
+            "//time/@datetime | "
+            "//meta[@property='article:published_time']/@content | "
+            "//meta[@name='publish-date']/@content"
+        ).get()
+    )
+
+    keywords_raw = response.xpath("//meta[@name='keywords']/@content").get()
+    keywords = []
+    if keywords_raw:
+        keywords.extend([k.strip() for k in keywords_raw.split(",") if k.strip()])
+    keywords.extend(
+        [
+            clean_text(v)
+            for v in response.xpath(
+                "//a[contains(@href,'/tags/')]/text() | "
+                "//span[contains(@class,'tag')]//text()"
+            ).getall()
+            if clean_text(v)
+        ]
+    )
+    keywords = list(dict.fromkeys(keywords))
+
+    authors = [
+        clean_text(v)
+        for v in response.xpath(
+            "//a[contains(@href,'/daily/author')]/text() | "
+            "//span[contains(@class,'author')]//text() | "
+            "//meta[@name='author']/@content"
+        ).getall()
+        if clean_text(v)
+    ]
+    authors = list(dict.fromkeys(authors))
+
+    header_photo_url = clean_text(
+        response.xpath(
+            "//meta[@property='og:image']/@content | "
+            "//figure//img/@src | "
+            "//img[contains(@class,'article__image')]/@src"
+        ).get()
+    )
+    if header_photo_url and header_photo_url.startswith("/"):
+        header_photo_url = urljoin(response.url, header_photo_url)
+
+    item = KpNewsItem(
+        title=title,
+        description=description,
+        article_text=article_text,
+        publication_datetime=publication_datetime,
+        keywords=keywords,
+        authors=authors,
+        source_url=response.url,
+        header_photo_url=header_photo_url,
+        header_photo_base64="",
+    )
+
+    # Required fields fallback to avoid empty mandatory values after extraction.
+    if not item["description"]:
+        item["description"] = item["title"]
+    if not item["article_text"]:
+        item["article_text"] = item["description"] or item["title"]
+    if not item["publication_datetime"]:
+        text_dt = clean_text(
+            response.xpath(
+                "//*[contains(@class,'date') or contains(@class,'time')]//text()"
+            ).get()
+        )
+        item["publication_datetime"] = text_dt
+    if not item["keywords"]:
+        slug_parts = [p for p in re.split(r"[/_-]+", response.url) if p]
+        item["keywords"] = slug_parts[-3:]
+    if not item["authors"]:
+        item["authors"] = ["kp.ru"]
+
+    return item
+
+
 class KpRuSpider(scrapy.Spider):
     name = "kp_ru"
     allowed_domains = ["kp.ru", "www.kp.ru"]
@@ -31,8 +133,12 @@ class KpRuSpider(scrapy.Spider):
         spider.use_playwright_requests = bool(
             crawler.settings.getbool("USE_PLAYWRIGHT_REQUESTS", True)
         )
+        archive_dir = crawler.settings.get("HTML_ARCHIVE_DIR")
+        if archive_dir:
+            spider.html_archive = HtmlArchive(archive_dir)
         if getattr(spider, "max_articles", None) is None:
             spider.max_articles = int(crawler.settings.getint("MAX_ARTICLES", 1000))
+        spider.news_ids_per_day = crawler.settings.getint("CRAWL_NEWS_IDS_PER_DAY", 400)
         return spider
 
     def __init__(self, max_articles=None, *args, **kwargs):
@@ -45,6 +151,9 @@ class KpRuSpider(scrapy.Spider):
         self.parsed_articles = 0
         self.seen_links = set()
         self.use_playwright_requests = True
+        self.html_archive = None
+        self.news_ids_per_day = 400
+        self.recency_scheduler = None
 
     def _request_meta(self):
         return {"playwright": True} if self.use_playwright_requests else {}
@@ -64,7 +173,29 @@ class KpRuSpider(scrapy.Spider):
         )
         return any(re.search(pattern, url) for pattern in patterns)
 
+    def _article_requests(self, response, hrefs):
+        for href in hrefs:
+            absolute_url = urljoin(response.url, href)
+            if not self._is_article_url(absolute_url):
+                continue
+            if absolute_url in self.seen_links:
+                continue
+            self.seen_links.add(absolute_url)
+
+            priority = self.recency_scheduler.offer(absolute_url)
+            if priority is None:
+                continue
+            # Downloaded plus still queued; never above max_articles.
+            self.collected_links = len(self.recency_scheduler)
+            yield scrapy.Request(
+                url=absolute_url,
+                callback=self.parse_article,
+                meta={**self._request_meta(), "kp_article": True},
+                priority=priority,
+            )
+
     def start_requests(self):
+        self.recency_scheduler = RecencyScheduler(self.max_articles, self.news_ids_per_day)
         for url in self.start_urls:
             yield scrapy.Request(
                 url=url,
@@ -84,25 +215,9 @@ class KpRuSpider(scrapy.Spider):
         for xpath in link_xpaths:
             links.extend(response.xpath(xpath).getall())
 
-        for href in links:
-            if self.collected_links >= self.max_articles:
-                break
+        yield from self._article_requests(response, links)
 
-            absolute_url = urljoin(response.url, href)
-            if not self._is_article_url(absolute_url):
-                continue
-            if absolute_url in self.seen_links:
-                continue
-
-            self.seen_links.add(absolute_url)
-            self.collected_links += 1
-            yield scrapy.Request(
-                url=absolute_url,
-                callback=self.parse_article,
-                meta=self._request_meta(),
-            )
-
-        if self.collected_links < self.max_articles:
+        if not self.recency_scheduler.is_full():
             next_page = response.xpath(
                 "//a[contains(@class,'pagination') or contains(., 'Следующая')]/@href"
             ).get()
@@ -115,121 +230,18 @@ class KpRuSpider(scrapy.Spider):
 
     def parse_article(self, response):
         self.parsed_articles += 1
-
-        title = clean_text(
-            response.xpath(
-                "//h1/text() | //meta[@property='og:title']/@content | //title/text()"
-            ).get()
-        )
-
-        description = clean_text(
-            response.xpath(
-                "//meta[@name='description']/@content | "
-                "//meta[@property='og:description']/@content"
-            ).get()
-        )
-
-        article_text_nodes = response.xpath(
-            "//div[@data-gtm-el='content-body']//p//text() | "
-            "//div[contains(@class,'article__text')]//p//text() | "
-            "//div[contains(@class,'article-content')]//p//text() | "
-            "//article//p//text()"
-        ).getall()
-        article_text = clean_join(article_text_nodes)
-
-        publication_datetime = clean_text(
-            response.xpath(
-                "//time/@datetime | "
-                "//meta[@property='article:published_time']/@content | "
-                "//meta[@name='publish-date']/@content"
-            ).get()
-        )
-
-        keywords_raw = response.xpath("//meta[@name='keywords']/@content").get()
-        keywords = []
-        if keywords_raw:
-            keywords.extend([k.strip() for k in keywords_raw.split(",") if k.strip()])
-        keywords.extend(
-            [
-                clean_text(v)
-                for v in response.xpath(
-                    "//a[contains(@href,'/tags/')]/text() | "
-                    "//span[contains(@class,'tag')]//text()"
-                ).getall()
-                if clean_text(v)
-            ]
-        )
-        keywords = list(dict.fromkeys(keywords))
-
-        authors = [
-            clean_text(v)
-            for v in response.xpath(
-                "//a[contains(@href,'/daily/author')]/text() | "
-                "//span[contains(@class,'author')]//text() | "
-                "//meta[@name='author']/@content"
-            ).getall()
-            if clean_text(v)
-        ]
-        authors = list(dict.fromkeys(authors))
-
-        header_photo_url = clean_text(
-            response.xpath(
-                "//meta[@property='og:image']/@content | "
-                "//figure//img/@src | "
-                "//img[contains(@class,'article__image')]/@src"
-            ).get()
-        )
-        if header_photo_url and header_photo_url.startswith("/"):
-            header_photo_url = urljoin(response.url, header_photo_url)
-
-        item = KpNewsItem(
-            title=title,
-            description=description,
-            article_text=article_text,
-            publication_datetime=publication_datetime,
-            keywords=keywords,
-            authors=authors,
-            source_url=response.url,
-            header_photo_url=header_photo_url,
-            header_photo_base64="",
-        )
-
-        # Required fields fallback to avoid empty mandatory values after extraction.
-        if not item["description"]:
-            item["description"] = item["title"]
-        if not item["article_text"]:
-            item["article_text"] = item["description"] or item["title"]
-        if not item["publication_datetime"]:
-            text_dt = clean_text(
-                response.xpath(
-                    "//*[contains(@class,'date') or contains(@class,'time')]//text()"
-                ).get()
+        if self.html_archive is not None:
+            self.html_archive.save(
+                response.url, response.body, response.encoding, response.status
             )
-            item["publication_datetime"] = text_dt
-        if not item["keywords"]:
-            slug_parts = [p for p in re.split(r"[/_-]+", response.url) if p]
-            item["keywords"] = slug_parts[-3:]
-        if not item["authors"]:
-            item["authors"] = ["kp.ru"]
 
-        yield item
+        yield extract_article(response)
 
-        # Continue crawling from discovered article links until target count.
-        if self.collected_links >= self.max_articles:
+        # Continue crawling from discovered article links while they can
+        # still displace older URLs from the budget.
+        if not self.recency_scheduler.should_expand(response.url):
             return
-        extra_links = response.xpath("//a[@href]/@href").getall()
-        for href in extra_links:
-            if self.collected_links >= self.max_articles:
-                break
-            absolute_url = urljoin(response.url, href)
-            if not self._is_article_url(absolute_url):
-                continue
-            if absolute_url in self.seen_links:
-                continue
-            self.seen_links.add(absolute_url)
-            self.collected_links += 1
-            yield scrapy.Request(
-                url=absolute_url,
-                callback=self.parse_article,
-                meta=self._request_meta(),
-            )
+        extra_links = response.xpath(
+            "//a[contains(@href, '/online/news/') or contains(@href, '/daily/')]/@href"
+        ).getall()
+        yield from self._article_requests(response, extra_links)
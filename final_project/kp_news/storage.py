@@ -0,0 +1,120 @@
+import base64
+import zlib
+
+
+LAYOUTS = ("inline", "split")
+BODY_FIELDS = ("article_text", "header_photo_base64")
+LISTING_PROJECTION = {"_id": 0, "title": 1, "publication_datetime": 1, "source_url": 1}
+
+
+def bodies_collection_name(coll_name):
+    return f"{coll_name}_bodies"
+
+
+# Listing indexes created before the source_url tiebreak was added.
+OLD_LISTING_INDEXES = (
+    "publication_datetime_-1_title_1_source_url_1",
+    "authors_1_publication_datetime_-1",
+    "keywords_1_publication_datetime_-1",
+)
+
+
+def ensure_listing_indexes(collection):
+    # Needed in both layouts: covers the default "newest first" listing with
+    # LISTING_PROJECTION, and the source_url tiebreak matches the /articles
+    # cursor order.
+    existing = collection.index_information()
+    for name in OLD_LISTING_INDEXES:
+        if name in existing:
+            collection.drop_index(name)
+    collection.create_index([("publication_datetime", -1), ("source_url", -1), ("title", 1)])
+    collection.create_index([("authors", 1), ("publication_datetime", -1), ("source_url", -1)])
+    collection.create_index([("keywords", 1), ("publication_datetime", -1), ("source_url", -1)])
+
+
+def split_document(doc):
+    text = doc.get("article_text") or ""
+    photo_b64 = doc.get("header_photo_base64") or ""
+    lean = {key: value for key, value in doc.items() if key not in BODY_FIELDS and key != "_id"}
+    lean["text_length"] = len(text)
+    lean["has_photo"] = bool(photo_b64)
+
+    # Photos are stored as raw bytes (a quarter smaller than base64); they are
+    # already compressed, so only the text goes through zlib.
+    try:
+        photo = base64.b64decode(photo_b64) if photo_b64 else None
+    except ValueError:
+        photo = None
+    body = {
+        "_id": doc.get("source_url"),
+        "article_text_z": zlib.compress(text.encode("utf-8"), 6),
+        "header_photo": photo,
+    }
+    return lean, body
+
+
+def body_text(body):
+    packed = (body or {}).get("article_text_z")
+    if not packed:
+        return ""
+    return zlib.decompress(packed).decode("utf-8")
+
+
+def join_document(lean, body):
+    doc = {key: value for key, value in lean.items() if key not in ("text_length", "has_photo")}
+    doc["article_text"] = body_text(body)
+    photo = (body or {}).get("header_photo")
+    doc["header_photo_base64"] = base64.b64encode(photo).decode("ascii") if photo else ""
+    return doc
+
+
+def attach_texts(bodies, docs):
+    urls = [doc.get("source_url") for doc in docs if doc.get("source_url")]
+    found = {
+        body["_id"]: body
+        for body in bodies.find({"_id": {"$in": urls}}, {"article_text_z": 1})
+    }
+    for doc in docs:
+        doc["article_text"] = body_text(found.get(doc.get("source_url")))
+    return docs
+
+
+def migrate(collection, bodies, target, batch_size=500):
+    from pymongo import ReplaceOne
+
+    if target not in LAYOUTS:
+        raise ValueError(f"Unknown storage layout: {target}")
+
+    # Documents still carrying article_text are inline; lean ones have text_length.
+    marker = "article_text" if target == "split" else "text_length"
+    migrated = 0
+    lean_ops, body_ops = [], []
+
+    def flush():
+        if body_ops:
+            bodies.bulk_write(body_ops, ordered=False)
+        if lean_ops:
+            collection.bulk_write(lean_ops, ordered=False)
+        body_ops.clear()
+        lean_ops.clear()
+
+    for doc in collection.find({marker: {"$exists": True}}):
+        source_url = doc.get("source_url")
+        if not source_url:
+            continue
+        if target == "split":
+            lean, body = split_document(doc)
+            body_ops.append(ReplaceOne({"_id": source_url}, body, upsert=True))
+            lean_ops.append(ReplaceOne({"_id": doc["_id"]}, lean))
+        else:
+            body = bodies.find_one({"_id": source_url})
+            lean_ops.append(ReplaceOne({"_id": doc["_id"]}, join_document(doc, body)))
+        migrated += 1
+        if len(lean_ops) >= batch_size:
+            flush()
+    flush()
+
+    ensure_listing_indexes(collection)
+    if target == "inline":
+        bodies.drop()
+    return migrated
@@ -2,6 +2,9 @@ import json
 import os
 import sys
 
+from kp_news.rollups import rebuild_rollups
+from kp_news.storage import bodies_collection_name, ensure_listing_indexes, split_document
+
 
 def main():
     try:
@@ -27,6 +30,10 @@ def main():
         sys.exit(1)
 
     collection = client[db_name][coll_name]
+    ensure_listing_indexes(collection)
+    bodies = None
+    if os.environ.get("MONGO_STORAGE_LAYOUT", "inline") == "split":
+        bodies = client[db_name][bodies_collection_name(coll_name)]
 
     loaded = 0
     with open(sample_path, "r", encoding="utf-8") as file:
@@ -37,10 +44,16 @@ def main():
             source_url = doc.get("source_url")
             if not source_url:
                 continue
-            collection.replace_one({"source_url": source_url}, doc, upsert=True)
+            if bodies is not None:
+                doc, body = split_document(doc)
+                bodies.replace_one({"_id": source_url}, body, upsert=True)
+            # $set keeps link-mode alternate_urls on documents already stored.
+            collection.update_one({"source_url": source_url}, {"$set": doc}, upsert=True)
             loaded += 1
 
     print(f"Loaded into MongoDB: {loaded} documents")
+    rebuild_rollups(client[db_name], collection)
+    print("Rollups rebuilt")
     client.close()
 
 
@@ -0,0 +1,397 @@
+import argparse
+import asyncio
+import base64
+from datetime import datetime, timedelta, timezone
+import json
+import os
+from pathlib import Path
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+
+DEFAULT_MIX = [
+    "6:/?n=10",
+    "2:/?n=100",
+    "1:/stats/daily",
+    "1:/stats/authors",
+]
+
+WORDS = (
+    "москва россия правительство заявил сообщил новости регион сегодня "
+    "президент эксперт губернатор рубль цены погода суд министерство "
+    "житель город власти решение проект данные компания вопрос"
+).split()
+AUTHORS = [f"Автор {idx}" for idx in range(40)]
+KEYWORDS = [f"тема {idx}" for idx in range(200)]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Load-test fastapi_service_news against synthetic articles seeded into a "
+            "local MongoDB. The database given by --database is dropped and re-seeded."
+        )
+    )
+    parser.add_argument(
+        "--mongo-uri",
+        default="mongodb://localhost:27017",
+        help="MongoDB to seed and serve from (default: mongodb://localhost:27017).",
+    )
+    parser.add_argument(
+        "--mongomock",
+        action="store_true",
+        help=(
+            "Smoke mode: run against in-process mongomock instead of MongoDB. "
+            "Checks that the harness works; latencies are not representative."
+        ),
+    )
+    parser.add_argument(
+        "--database",
+        default="kp_news_loadtest",
+        help="Database to seed and serve from (default: kp_news_loadtest).",
+    )
+    parser.add_argument(
+        "--articles",
+        type=int,
+        default=2000,
+        help="Number of synthetic articles to seed (default: 2000).",
+    )
+    parser.add_argument(
+        "--text-kb",
+        type=int,
+        default=5,
+        help="Approximate article_text size in KB (default: 5).",
+    )
+    parser.add_argument(
+        "--photo-kb",
+        type=int,
+        default=150,
+        help="Raw photo size in KB before base64 (default: 150).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="Concurrent client connections (default: 16).",
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=500,
+        help="Total requests to send (default: 500).",
+    )
+    parser.add_argument(
+        "--mix",
+        nargs="+",
+        default=DEFAULT_MIX,
+        help="Weighted request mix as weight:path (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Random seed for data generation and request mix (default: 42).",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the report as JSON.",
+    )
+    parser.add_argument("--serve", type=int, default=0, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def synthetic_articles(count, text_kb, photo_kb, seed):
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    for idx in range(count):
+        words = []
+        size = 0
+        while size < text_kb * 1024:
+            word = rng.choice(WORDS)
+            words.append(word)
+            size += len(word.encode("utf-8")) + 1
+        published = now - timedelta(minutes=rng.randrange(30 * 24 * 60))
+        photo = rng.randbytes(photo_kb * 1024)
+        yield {
+            "title": " ".join(rng.choices(WORDS, k=8)).capitalize(),
+            "description": " ".join(rng.choices(WORDS, k=25)),
+            "article_text": " ".join(words),
+            "publication_datetime": published.isoformat(),
+            "keywords": rng.sample(KEYWORDS, k=5),
+            "authors": rng.sample(AUTHORS, k=rng.randint(1, 2)),
+            "source_url": f"https://www.kp.ru/online/news/{1_000_000 + idx}/",
+            "header_photo_url": f"https://s.kp.ru/photo/{idx}.jpg",
+            # A distinct photo per document, as stored by PhotoDownloaderPipeline.
+            "header_photo_base64": base64.b64encode(photo).decode("ascii"),
+        }
+
+
+def seed_database(db, args):
+    from kp_news.rollups import (
+        AUTHORS_COLLECTION,
+        DAILY_COLLECTION,
+        KEYWORDS_COLLECTION,
+        apply_rollups,
+        ensure_rollup_indexes,
+    )
+    from kp_news.storage import ensure_listing_indexes
+
+    collection = db[os.getenv("MONGO_COLLECTION", "articles")]
+    collection.drop()
+    # Rollups count only this run's articles, not leftovers from a previous run.
+    for coll_name in (DAILY_COLLECTION, AUTHORS_COLLECTION, KEYWORDS_COLLECTION):
+        db[coll_name].drop()
+    collection.create_index("source_url", unique=True)
+    collection.create_index("publication_datetime")
+    ensure_listing_indexes(collection)
+    ensure_rollup_indexes(db)
+    batch = []
+    for doc in synthetic_articles(args.articles, args.text_kb, args.photo_kb, args.seed):
+        apply_rollups(db, None, doc)
+        batch.append(doc)
+        if len(batch) >= 200:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+
+
+def mongomock_patch(args):
+    # Patches pymongo itself, so the service still opens a client per request
+    # exactly as it does against a real server.
+    try:
+        import mongomock
+    except ImportError:
+        raise SystemExit("Install mongomock to use --mongomock")
+    return mongomock.patch(servers=(args.mongo_uri,))
+
+
+def serve(args):
+    import uvicorn
+
+    import fastapi_service_news
+
+    os.environ["MONGO_URI"] = args.mongo_uri
+    os.environ["MONGO_DATABASE"] = args.database
+    if not args.mongomock:
+        uvicorn.run(fastapi_service_news.app, host="127.0.0.1", port=args.serve, log_level="warning")
+        return
+
+    from pymongo import MongoClient
+
+    with mongomock_patch(args):
+        seed_database(MongoClient(args.mongo_uri)[args.database], args)
+        uvicorn.run(fastapi_service_news.app, host="127.0.0.1", port=args.serve, log_level="warning")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="ascii") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, pid, interval=0.1):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.peak = max(self.peak, rss_bytes(self.pid) or 0)
+            time.sleep(self.interval)
+
+
+async def http_get(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n\r\n".encode()
+        )
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    status_line = response.split(b"\r\n", 1)[0].split()
+    status = int(status_line[1]) if len(status_line) > 1 else 0
+    return status, len(response)
+
+
+async def wait_until_ready(port, process, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited with code {process.returncode}")
+        try:
+            status, _ = await http_get(port, "/?n=1")
+            if status == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise SystemExit("Server did not become ready in time")
+
+
+def parse_mix(entries):
+    paths, weights = [], []
+    for entry in entries:
+        weight, _, path = entry.partition(":")
+        if not path.startswith("/"):
+            raise SystemExit(f"Invalid mix entry (expected weight:/path): {entry}")
+        paths.append(path)
+        weights.append(float(weight))
+    return paths, weights
+
+
+async def drive(port, args):
+    paths, weights = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    plan = rng.choices(paths, weights=weights, k=args.requests)
+    results = []
+    position = 0
+
+    async def worker():
+        nonlocal position
+        while position < len(plan):
+            path = plan[position]
+            position += 1
+            started = time.perf_counter()
+            try:
+                status, size = await http_get(port, path)
+            except OSError:
+                status, size = 0, 0
+            results.append((path, status, size, time.perf_counter() - started))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return results, time.perf_counter() - started
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(results, elapsed):
+    latencies = sorted(latency for _, _, _, latency in results)
+    errors = sum(1 for _, status, _, _ in results if status != 200)
+    return {
+        "requests": len(results),
+        "errors": errors,
+        "throughput_rps": round(len(results) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "avg_response_kb": round(
+            sum(size for _, _, size, _ in results) / max(len(results), 1) / 1024, 1
+        ),
+    }
+
+
+def build_report(args, results, elapsed, rss_idle, rss_peak, rss_end):
+    by_path = {}
+    for entry in results:
+        by_path.setdefault(entry[0], []).append(entry)
+    mb = 1024 * 1024
+    return {
+        "backend": "mongomock (smoke test)" if args.mongomock else "mongodb",
+        "articles": args.articles,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 2),
+        "total": summarize(results, elapsed),
+        "paths": {path: summarize(items, elapsed) for path, items in sorted(by_path.items())},
+        "server_rss_mb": {
+            "idle": round((rss_idle or 0) / mb, 1),
+            "peak": round(rss_peak / mb, 1),
+            "end": round((rss_end or 0) / mb, 1),
+        },
+    }
+
+
+def print_report(report):
+    print(
+        f"Backend: {report['backend']}, articles: {report['articles']}, "
+        f"concurrency: {report['concurrency']}, elapsed: {report['elapsed_s']} s"
+    )
+    header = f"{'path':<24}{'reqs':>7}{'err':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'KB':>9}"
+    print(header)
+    rows = list(report["paths"].items()) + [("TOTAL", report["total"])]
+    for path, stats in rows:
+        print(
+            f"{path:<24}{stats['requests']:>7}{stats['errors']:>6}"
+            f"{stats['throughput_rps']:>9}{stats['p50_ms']:>9}{stats['p95_ms']:>9}"
+            f"{stats['p99_ms']:>9}{stats['avg_response_kb']:>9}"
+        )
+    rss = report["server_rss_mb"]
+    print(f"Server RSS (MB): idle {rss['idle']}, peak {rss['peak']}, end {rss['end']}")
+
+
+async def run_load_test(args):
+    if not args.mongomock:
+        from pymongo import MongoClient
+
+        client = MongoClient(args.mongo_uri, serverSelectionTimeoutMS=5000)
+        try:
+            client.admin.command("ping")
+        except Exception as exc:
+            raise SystemExit(
+                f"MongoDB unavailable at {args.mongo_uri}: {exc} (start mongod or pass --mongomock)"
+            )
+        seed_database(client[args.database], args)
+        client.close()
+
+    port = free_port()
+    command = [sys.executable, str(Path(__file__).resolve()), "--serve", str(port)]
+    command += sys.argv[1:]
+    process = subprocess.Popen(command, cwd=Path(__file__).resolve().parent)
+    try:
+        await wait_until_ready(port, process)
+        rss_idle = rss_bytes(process.pid)
+        sampler = RssSampler(process.pid)
+        sampler.start()
+        results, elapsed = await drive(port, args)
+        sampler.stopped.set()
+        sampler.join()
+        rss_end = rss_bytes(process.pid)
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    return build_report(args, results, elapsed, rss_idle, sampler.peak, rss_end)
+
+
+def main():
+    args = parse_args()
+    if args.serve:
+        serve(args)
+        return
+
+    report = asyncio.run(run_load_test(args))
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
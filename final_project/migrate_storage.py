@@ -0,0 +1,56 @@
+import argparse
+import os
+import sys
+
+from kp_news.storage import LAYOUTS, bodies_collection_name, migrate
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Convert the articles collection between storage layouts."
+    )
+    parser.add_argument(
+        "--to",
+        choices=LAYOUTS,
+        default="split",
+        help="Target layout (default: split).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Documents per bulk write (default: 500).",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        from pymongo import MongoClient
+    except ImportError:
+        print("Install pymongo in .venv first", file=sys.stderr)
+        sys.exit(1)
+
+    uri = os.environ.get("MONGO_URI", "mongodb://localhost:27017")
+    db_name = os.environ.get("MONGO_DATABASE", "kp_news")
+    coll_name = os.environ.get("MONGO_COLLECTION", "articles")
+
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    try:
+        client.admin.command("ping")
+    except Exception as exc:
+        print(f"MongoDB unavailable: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    db = client[db_name]
+    migrated = migrate(
+        db[coll_name], db[bodies_collection_name(coll_name)], args.to, args.batch_size
+    )
+    print(f"Migrated to {args.to} layout: {migrated} documents")
+    print("Set MONGO_STORAGE_LAYOUT accordingly for the spider and the API service.")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
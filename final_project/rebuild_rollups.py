@@ -0,0 +1,32 @@
+import os
+import sys
+
+from kp_news.rollups import rebuild_rollups
+
+
+def main():
+    try:
+        from pymongo import MongoClient
+    except ImportError:
+        print("Install pymongo in .venv first", file=sys.stderr)
+        sys.exit(1)
+
+    uri = os.environ.get("MONGO_URI", "mongodb://localhost:27017")
+    db_name = os.environ.get("MONGO_DATABASE", "kp_news")
+    coll_name = os.environ.get("MONGO_COLLECTION", "articles")
+
+    client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+    try:
+        client.admin.command("ping")
+    except Exception as exc:
+        print(f"MongoDB unavailable: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    db = client[db_name]
+    rebuild_rollups(db, db[coll_name])
+    print(f"Rollups rebuilt from {db_name}.{coll_name}")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import argparse
+from multiprocessing import Pool
+import os
+import sys
+
+from kp_news.archive import HtmlArchive
+from kp_news.rollups import rebuild_rollups
+from kp_news.storage import bodies_collection_name, split_document
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Re-run article extraction over the raw HTML archive and update MongoDB."
+    )
+    parser.add_argument(
+        "--archive",
+        default="archive",
+        help="HTML archive directory written with HTML_ARCHIVE_DIR (default: archive).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of extraction processes (default: CPU count).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=500,
+        help="Documents per Mongo bulk write (default: 500).",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Extract and validate only, do not write to MongoDB.",
+    )
+    return parser.parse_args()
+
+
+def reextract(path):
+    from scrapy.exceptions import DropItem
+    from scrapy.http import HtmlResponse
+
+    from kp_news.pipelines import ValidationAndNormalizePipeline
+    from kp_news.spiders.kp_ru_spider import extract_article
+
+    try:
+        record = HtmlArchive.load(path)
+        response = HtmlResponse(
+            url=record["url"], body=record["body"].encode("utf-8"), encoding="utf-8"
+        )
+        item = ValidationAndNormalizePipeline().process_item(extract_article(response), None)
+    except DropItem as exc:
+        return "dropped", str(path), str(exc)
+    except Exception as exc:
+        return "error", str(path), repr(exc)
+
+    data = dict(item)
+    # Photos are not re-downloaded offline; keep whatever Mongo already has.
+    data.pop("header_photo_base64", None)
+    return "ok", data, ""
+
+
+def flush_batches(collection, bodies, batch, body_batch):
+    # Bodies go first so lean documents never point at missing text.
+    if body_batch:
+        bodies.bulk_write(body_batch, ordered=False)
+        body_batch.clear()
+    if batch:
+        collection.bulk_write(batch, ordered=False)
+        batch.clear()
+
+
+def stored_urls(collection):
+    # Only articles the crawl actually kept are refreshed: drop-mode
+    # duplicates were never stored and link-mode ones live on as another
+    # document's alternate_urls, so neither may come back as its own article.
+    stored = set()
+    alternates = set()
+    for doc in collection.find({}, {"_id": 0, "source_url": 1, "alternate_urls": 1}):
+        if doc.get("source_url"):
+            stored.add(doc["source_url"])
+        alternates.update(doc.get("alternate_urls") or [])
+    return stored - alternates
+
+
+def main():
+    args = parse_args()
+    archive = HtmlArchive(args.archive)
+    paths = archive.iter_paths()
+    if not paths:
+        print(f"No archived pages found in {archive.directory}", file=sys.stderr)
+        sys.exit(1)
+
+    client = None
+    collection = None
+    bodies = None
+    if not args.dry_run:
+        try:
+            from pymongo import MongoClient, UpdateOne
+        except ImportError:
+            print("Install pymongo in .venv first", file=sys.stderr)
+            sys.exit(1)
+
+        uri = os.environ.get("MONGO_URI", "mongodb://localhost:27017")
+        db_name = os.environ.get("MONGO_DATABASE", "kp_news")
+        coll_name = os.environ.get("MONGO_COLLECTION", "articles")
+        client = MongoClient(uri, serverSelectionTimeoutMS=5000)
+        try:
+            client.admin.command("ping")
+        except Exception as exc:
+            print(f"MongoDB unavailable: {exc}", file=sys.stderr)
+            sys.exit(1)
+        collection = client[db_name][coll_name]
+        if os.environ.get("MONGO_STORAGE_LAYOUT", "inline") == "split":
+            bodies = client[db_name][bodies_collection_name(coll_name)]
+        known_urls = stored_urls(collection)
+
+    counts = {"ok": 0, "dropped": 0, "error": 0, "skipped": 0}
+    batch = []
+    body_batch = []
+    with Pool(processes=args.workers) as pool:
+        for status, payload, detail in pool.imap_unordered(reextract, paths, chunksize=16):
+            counts[status] += 1
+            if status != "ok":
+                print(f"{status}: {payload}: {detail}", file=sys.stderr)
+                continue
+            if collection is None:
+                continue
+            if payload["source_url"] not in known_urls:
+                counts["skipped"] += 1
+                continue
+            if bodies is not None:
+                lean, body = split_document(payload)
+                lean.pop("has_photo")
+                body_batch.append(
+                    UpdateOne(
+                        {"_id": body["_id"]},
+                        {"$set": {"article_text_z": body["article_text_z"]}},
+                    )
+                )
+                batch.append(
+                    UpdateOne(
+                        {"source_url": payload["source_url"]},
+                        {"$set": lean},
+                    )
+                )
+            else:
+                batch.append(
+                    UpdateOne({"source_url": payload["source_url"]}, {"$set": payload})
+                )
+            if len(batch) >= args.batch_size:
+                flush_batches(collection, bodies, batch, body_batch)
+
+    flush_batches(collection, bodies, batch, body_batch)
+
+    print(
+        f"Re-extracted: {counts['ok']}, dropped: {counts['dropped']}, "
+        f"errors: {counts['error']}, skipped (not stored or duplicate): {counts['skipped']} "
+        f"(of {len(paths)} archived pages)"
+    )
+    if client is not None:
+        rebuild_rollups(client[db_name], collection)
+        print("Rollups rebuilt")
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
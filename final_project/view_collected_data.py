@@ -1,7 +1,11 @@
 import argparse
+from functools import partial
 import json
 from pathlib import Path
 
+from jsonl_index import JsonlIndex, iter_numbered
+from jsonl_query import run_query
+
 
 DEFAULT_FIELDS = [
     "title",
@@ -44,19 +48,66 @@ def parse_args():
         default=220,
         help="Максимальная длина article_text_preview (по умолчанию: 220).",
     )
+    position = parser.add_mutually_exclusive_group()
+    position.add_argument(
+        "--offset",
+        type=int,
+        default=None,
+        help="Сколько записей пропустить перед выводом (через индекс смещений).",
+    )
+    position.add_argument(
+        "--range",
+        default=None,
+        metavar="START:END",
+        help=(
+            "Номера записей START..END включительно, с 1 (через индекс смещений); "
+            "нумерация совпадает с обычным выводом."
+        ),
+    )
+    parser.add_argument(
+        "--where",
+        nargs="+",
+        default=[],
+        metavar="PREDICATE",
+        help=(
+            "Фильтры запроса: поле~подстрока, поле=~regex, поле>=дата, "
+            "поле<=дата, поле@a,b (вхождение в список), поле?empty / поле?nonempty."
+        ),
+    )
+    parser.add_argument(
+        "--stats",
+        nargs="+",
+        default=[],
+        metavar="FIELD",
+        help="Посчитать частоты значений полей среди подходящих записей.",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="Сколько самых частых значений показать для --stats (по умолчанию: 20).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Число процессов для режима запроса (по умолчанию: число CPU).",
+    )
     return parser.parse_args()
 
 
-def iter_jsonl(path: Path):
-    with path.open("r", encoding="utf-8", errors="ignore") as file:
-        for line in file:
-            raw = line.strip().lstrip("\x00")
-            if not raw or not raw.startswith("{"):
-                continue
-            try:
-                yield json.loads(raw)
-            except json.JSONDecodeError:
-                continue
+def parse_range(value: str):
+    start, sep, end = value.partition(":")
+    try:
+        start_num = int(start) if start else 1
+        end_num = int(end) if end else None
+    except ValueError:
+        raise SystemExit(f"Некорректный диапазон: {value}")
+    if not sep:
+        end_num = start_num
+    if start_num < 1 or (end_num is not None and end_num < start_num):
+        raise SystemExit(f"Некорректный диапазон: {value}")
+    return start_num - 1, end_num
 
 
 def compact_record(record: dict, fields: list[str], preview_len: int):
@@ -76,9 +127,20 @@ def main():
     if not path.exists():
         raise SystemExit(f"Файл не найден: {path}")
 
+    if args.where or args.stats:
+        run_query_mode(path, args)
+        return
+
+    limit = args.limit
+    if args.range is not None:
+        start, stop = parse_range(args.range)
+        # A closed range is shown in full regardless of --limit.
+        if stop is not None:
+            limit = stop - start
+
     shown = 0
-    for index, record in enumerate(iter_jsonl(path), start=1):
-        if shown >= args.limit:
+    for index, record in iter_selected(path, args):
+        if shown >= limit:
             break
         shown += 1
         print(f"\n--- Запись #{index} ---")
@@ -96,5 +158,48 @@ def main():
     print(f"\nПоказано записей: {shown}")
 
 
+def run_query_mode(path: Path, args):
+    if args.offset is not None or args.range is not None:
+        raise SystemExit("--where/--stats нельзя совмещать с --offset/--range")
+
+    if args.full:
+        project = dict
+    else:
+        project = partial(compact_record, fields=args.fields, preview_len=args.preview_len)
+    keep = 0 if args.stats else args.limit
+    try:
+        matched, records, counters = run_query(
+            path, args.where, args.stats, keep, project, args.workers
+        )
+    except ValueError as exc:
+        raise SystemExit(f"Некорректный фильтр: {exc}")
+
+    for index, record in records:
+        print(f"\n--- Запись #{index} ---")
+        print(json.dumps(record, ensure_ascii=False, indent=2))
+
+    for field, counter in counters.items():
+        print(f"\n--- {field}: {len(counter)} уникальных значений ---")
+        for value, count in counter.most_common(args.top):
+            print(f"{count:>8}  {value}")
+
+    print(f"\nПодходящих записей: {matched}")
+
+
+def iter_selected(path: Path, args):
+    if args.offset is None and args.range is None:
+        yield from iter_numbered(path)
+        return
+
+    if args.range is not None:
+        start, stop = parse_range(args.range)
+    else:
+        start, stop = max(args.offset, 0), None
+
+    with JsonlIndex(path) as index:
+        for position, record in index.iter_records(start, stop):
+            yield position + 1, record
+
+
 if __name__ == "__main__":
     main()
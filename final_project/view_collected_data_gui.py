@@ -1,12 +1,22 @@
 import argparse
 import base64
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import io
 import json
 from pathlib import Path
+import queue
+import re
+import threading
 import tkinter as tk
+from tkinter import font as tkfont
 from tkinter import ttk, messagebox
 import urllib.request
 
+from jsonl_index import JsonlIndex
+
 try:
     from PIL import Image, ImageTk
 except ImportError as exc:
@@ -25,6 +35,11 @@ DISPLAY_FIELDS = [
     "source_url",
 ]
 
+IMAGE_WORKERS = 4
+IMAGE_POLL_MS = 50
+SEARCH_POLL_MS = 200
+THUMBNAIL_SIZE = (860, 360)
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -35,6 +50,22 @@ def parse_args():
         default="sample.jsonl",
         help="Path to JSONL file (default: sample.jsonl).",
     )
+    parser.add_argument(
+        "--lazy",
+        action="store_true",
+        help="Read records on demand through a byte-offset index instead of loading the file.",
+    )
+    parser.add_argument(
+        "--image-cache-size",
+        type=int,
+        default=64,
+        help="How many decoded images to keep in memory (default: 64).",
+    )
+    parser.add_argument(
+        "--thumb-cache",
+        default=None,
+        help="Directory for an on-disk thumbnail cache (default: disabled).",
+    )
     return parser.parse_args()
 
 
@@ -50,21 +81,175 @@ def iter_jsonl(path: Path):
                 continue
 
 
+TITLE_RE = re.compile(rb'"title"\s*:\s*"((?:[^"\\]|\\.)*)"')
+PHOTO_KEY = b'"header_photo_base64"'
+WORD_RE = re.compile(r"\w+")
+
+
+class MemoryRecords:
+    def __init__(self, records: list[dict]):
+        self.records = records
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, idx):
+        return self.records[idx]
+
+    def title(self, idx):
+        return str(self.records[idx].get("title", ""))
+
+    def search_fields(self, idx):
+        return self.records[idx]
+
+
+class IndexedRecords:
+    def __init__(self, index: JsonlIndex, title_cache_size=4096):
+        self.index = index
+        self.title_cache_size = title_cache_size
+        self.titles = OrderedDict()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, idx):
+        return self.index.record(idx) or {}
+
+    def title(self, idx):
+        if idx in self.titles:
+            self.titles.move_to_end(idx)
+            return self.titles[idx]
+
+        # Only the title is pulled out of the raw line; the rest is parsed on selection.
+        match = TITLE_RE.search(self.index.raw(idx))
+        try:
+            title = json.loads(b'"' + match.group(1) + b'"') if match else ""
+        except ValueError:
+            title = ""
+        self.titles[idx] = title
+        if len(self.titles) > self.title_cache_size:
+            self.titles.popitem(last=False)
+        return title
+
+    def search_fields(self, idx):
+        raw = self.index.raw(idx).strip().lstrip(b"\x00")
+        # Cut the base64 photo out before parsing; it has no quotes or escapes,
+        # so its closing quote is the next one.
+        key = raw.find(PHOTO_KEY)
+        if key != -1:
+            start = raw.find(b'"', key + len(PHOTO_KEY))
+            end = raw.find(b'"', start + 1) if start != -1 else -1
+            if end != -1 and not raw[key + len(PHOTO_KEY):start].strip(b" :"):
+                raw = raw[:start + 1] + raw[end:]
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return {}
+
+
+class SearchIndex:
+    def __init__(self, records):
+        postings = {}
+        dated = []
+        for idx in range(len(records)):
+            fields = records.search_fields(idx)
+            names = [str(fields.get("title") or "")]
+            for key in ("authors", "keywords"):
+                value = fields.get(key) or []
+                names.extend(str(v) for v in (value if isinstance(value, list) else [value]))
+            tokens = set(WORD_RE.findall(" ".join(names).lower()))
+            for token in tokens:
+                postings.setdefault(token, []).append(idx)
+            day = str(fields.get("publication_datetime") or "")[:10]
+            if day:
+                dated.append((day, idx))
+        dated.sort()
+        self.size = len(records)
+        self.postings = postings
+        self.tokens = sorted(postings)
+        self.dated = dated
+
+    def _prefix_matches(self, prefix):
+        result = set()
+        pos = bisect_left(self.tokens, prefix)
+        while pos < len(self.tokens) and self.tokens[pos].startswith(prefix):
+            result.update(self.postings[self.tokens[pos]])
+            pos += 1
+        return result
+
+    def search(self, text, date_from="", date_to=""):
+        result = None
+        for term in WORD_RE.findall(text.lower()):
+            matches = self._prefix_matches(term)
+            result = matches if result is None else result & matches
+            if not result:
+                return []
+        if date_from or date_to:
+            lo = bisect_left(self.dated, (date_from,)) if date_from else 0
+            hi = bisect_right(self.dated, (date_to + "\uffff",)) if date_to else len(self.dated)
+            in_range = {idx for _, idx in self.dated[lo:hi]}
+            result = in_range if result is None else result & in_range
+        if result is None:
+            return range(self.size)
+        return sorted(result)
+
+
+class ThumbnailDiskCache:
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str):
+        return self.directory / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.png"
+
+    def load(self, key: str):
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            image = Image.open(path)
+            image.load()
+            return image
+        except Exception:
+            return None
+
+    def store(self, key: str, image):
+        try:
+            image.save(self._path(key), "PNG")
+        except Exception:
+            pass
+
+
 class DataViewerApp:
-    def __init__(self, root: tk.Tk, records: list[dict]):
+    def __init__(self, root: tk.Tk, records, image_cache_size=64, thumb_cache=None):
         self.root = root
         self.records = records
-        self.image_cache = {}
+        self.view = range(len(records))
+        self.top = 0
+        self.current = None
+        self.visible_rows = 1
+        # Record index -> PhotoImage (or None when the record has no image).
+        self.image_cache = OrderedDict()
+        self.image_cache_size = max(1, image_cache_size)
+        self.thumb_cache = thumb_cache
+        self.pending_images = set()
+        self.image_results = queue.Queue()
+        self.image_pool = ThreadPoolExecutor(max_workers=IMAGE_WORKERS)
         self.photo_ref = None
+        self.search_index = None
+        self.search_results = queue.Queue()
 
         self.root.title("Collected Data Viewer")
         self.root.geometry("1280x760")
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
 
         self._build_ui()
-        self._fill_list()
-        if self.records:
-            self.listbox.selection_set(0)
-            self.on_select(None)
+        self.root.after(IMAGE_POLL_MS, self._drain_image_results)
+        threading.Thread(target=self._build_search_index, daemon=True).start()
+        self.root.after(SEARCH_POLL_MS, self._check_search_index)
+        self._render_list()
+        if len(self.view):
+            self._select(0)
 
     def _build_ui(self):
         self.root.columnconfigure(0, weight=1)
@@ -74,16 +259,52 @@ class DataViewerApp:
         left_frame = ttk.Frame(self.root, padding=8)
         left_frame.grid(row=0, column=0, sticky="nsew")
         left_frame.columnconfigure(0, weight=1)
-        left_frame.rowconfigure(1, weight=1)
+        left_frame.rowconfigure(3, weight=1)
+
+        self.list_label_var = tk.StringVar(value="Articles (indexing...)")
+        ttk.Label(left_frame, textvariable=self.list_label_var).grid(row=0, column=0, sticky="w")
 
-        ttk.Label(left_frame, text="Articles").grid(row=0, column=0, sticky="w")
+        self.search_var = tk.StringVar(value="")
+        self.search_var.trace_add("write", self._on_search_changed)
+        ttk.Entry(left_frame, textvariable=self.search_var).grid(
+            row=1, column=0, columnspan=2, sticky="ew", pady=(4, 4)
+        )
 
+        dates = ttk.Frame(left_frame)
+        dates.grid(row=2, column=0, columnspan=2, sticky="ew", pady=(0, 4))
+        dates.columnconfigure(1, weight=1)
+        dates.columnconfigure(3, weight=1)
+        self.date_from_var = tk.StringVar(value="")
+        self.date_to_var = tk.StringVar(value="")
+        ttk.Label(dates, text="From").grid(row=0, column=0, padx=(0, 4))
+        ttk.Entry(dates, textvariable=self.date_from_var, width=12).grid(row=0, column=1, sticky="ew")
+        ttk.Label(dates, text="To").grid(row=0, column=2, padx=(8, 4))
+        ttk.Entry(dates, textvariable=self.date_to_var, width=12).grid(row=0, column=3, sticky="ew")
+        self.date_from_var.trace_add("write", self._on_search_changed)
+        self.date_to_var.trace_add("write", self._on_search_changed)
+
+        # The listbox only ever holds the visible window of rows; the
+        # scrollbar is driven by self.top over the whole view.
         self.listbox = tk.Listbox(left_frame, exportselection=False)
-        self.listbox.grid(row=1, column=0, sticky="nsew")
+        self.listbox.grid(row=3, column=0, sticky="nsew")
         self.listbox.bind("<<ListboxSelect>>", self.on_select)
+        self.listbox.bind("<Configure>", self._on_list_resize)
+        self.listbox.bind("<MouseWheel>", self._on_mousewheel)
+        self.listbox.bind("<Button-4>", lambda _event: self._scroll_rows(-3))
+        self.listbox.bind("<Button-5>", lambda _event: self._scroll_rows(3))
+        # The listbox only holds the rows on screen, so keyboard navigation
+        # moves through the whole view instead of Tk's default handling.
+        self.listbox.bind("<Up>", lambda _event: self._on_key_move(-1))
+        self.listbox.bind("<Down>", lambda _event: self._on_key_move(1))
+        self.listbox.bind("<Prior>", lambda _event: self._on_key_move(-max(self.visible_rows - 1, 1)))
+        self.listbox.bind("<Next>", lambda _event: self._on_key_move(max(self.visible_rows - 1, 1)))
+        self.row_height = tkfont.Font(font=self.listbox.cget("font")).metrics("linespace") + 1
+
+        self.scrollbar = ttk.Scrollbar(left_frame, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.grid(row=3, column=1, sticky="ns")
 
         controls = ttk.Frame(left_frame)
-        controls.grid(row=2, column=0, sticky="ew", pady=(8, 0))
+        controls.grid(row=4, column=0, columnspan=2, sticky="ew", pady=(8, 0))
         controls.columnconfigure(0, weight=1)
         controls.columnconfigure(1, weight=1)
         ttk.Button(controls, text="Prev", command=self.select_prev).grid(
@@ -120,36 +341,132 @@ class DataViewerApp:
         self.article_text.grid(row=3, column=0, sticky="nsew")
         self.article_text.configure(state="disabled")
 
-    def _fill_list(self):
-        for idx, record in enumerate(self.records, start=1):
-            title = str(record.get("title", "")).strip() or "(no title)"
-            self.listbox.insert("end", f"{idx:04d} | {title[:120]}")
+    def _render_list(self):
+        total = len(self.view)
+        self.top = max(0, min(self.top, total - self.visible_rows))
+        self.listbox.delete(0, "end")
+        for pos in range(self.top, min(self.top + self.visible_rows, total)):
+            idx = self.view[pos]
+            title = self.records.title(idx).strip() or "(no title)"
+            self.listbox.insert("end", f"{idx + 1:04d} | {title[:120]}")
+        if self.current is not None and self.top <= self.current < self.top + self.visible_rows:
+            self.listbox.selection_set(self.current - self.top)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_list_resize(self, event):
+        rows = max(1, event.height // self.row_height)
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self._render_list()
+
+    def _on_mousewheel(self, event):
+        self._scroll_rows(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _scroll_rows(self, delta):
+        self.top += delta
+        self._render_list()
+        return "break"
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.top = int(float(value) * len(self.view))
+        elif action == "scroll":
+            step = self.visible_rows if unit == "pages" else 1
+            self.top += int(value) * step
+        self._render_list()
 
     def _current_index(self):
-        selected = self.listbox.curselection()
-        if not selected:
-            return None
-        return selected[0]
+        return self.current
+
+    def _build_search_index(self):
+        try:
+            self.search_results.put(SearchIndex(self.records))
+        except Exception as exc:
+            self.search_results.put(exc)
+
+    def _check_search_index(self):
+        try:
+            result = self.search_results.get_nowait()
+        except queue.Empty:
+            self.root.after(SEARCH_POLL_MS, self._check_search_index)
+            return
+        if isinstance(result, Exception):
+            self.list_label_var.set(f"Articles (search unavailable: {result})")
+            return
+        self.search_index = result
+        self._apply_search()
+
+    def _on_search_changed(self, *_args):
+        if self.search_index is not None:
+            self._apply_search()
+
+    def _apply_search(self):
+        selected = self._current_record_index()
+        self.view = self.search_index.search(
+            self.search_var.get(),
+            self.date_from_var.get().strip(),
+            self.date_to_var.get().strip(),
+        )
+        self.list_label_var.set(f"Articles ({len(self.view)} / {len(self.records)})")
+        self.top = 0
+        self.current = None
+        if not len(self.view):
+            self._render_list()
+            self._clear_details()
+            return
+        # Keep the open article selected when it survives the new filter.
+        pos = bisect_left(self.view, selected) if selected is not None else 0
+        if pos >= len(self.view) or self.view[pos] != selected:
+            pos = 0
+        self.current = pos
+        self.top = max(pos - self.visible_rows // 2, 0)
+        self._render_list()
+        # Typing only reshapes the list; the detail pane is re-parsed and the
+        # image re-requested only when a different article ends up selected.
+        if self.view[pos] != selected:
+            self._show_current()
+
+    def _clear_details(self):
+        self.title_var.set("")
+        self._set_text(self.meta_text, "")
+        self._set_text(self.article_text, "")
+        self.image_label.configure(image="", text="")
+        self.photo_ref = None
+
+    def _select(self, pos):
+        self.current = pos
+        if pos < self.top:
+            self.top = pos
+        elif pos >= self.top + self.visible_rows:
+            self.top = pos - self.visible_rows + 1
+        self._render_list()
+        self._show_current()
 
     def select_prev(self):
         idx = self._current_index()
         if idx is None:
             return
         if idx > 0:
-            self.listbox.selection_clear(0, "end")
-            self.listbox.selection_set(idx - 1)
-            self.listbox.see(idx - 1)
-            self.on_select(None)
+            self._select(idx - 1)
 
     def select_next(self):
         idx = self._current_index()
         if idx is None:
             return
-        if idx < len(self.records) - 1:
-            self.listbox.selection_clear(0, "end")
-            self.listbox.selection_set(idx + 1)
-            self.listbox.see(idx + 1)
-            self.on_select(None)
+        if idx < len(self.view) - 1:
+            self._select(idx + 1)
+
+    def _on_key_move(self, delta):
+        if len(self.view):
+            idx = self._current_index()
+            target = 0 if idx is None else max(0, min(idx + delta, len(self.view) - 1))
+            if target != idx:
+                self._select(target)
+        return "break"
 
     def _set_text(self, widget: tk.Text, value: str):
         widget.configure(state="normal")
@@ -168,65 +485,127 @@ class DataViewerApp:
         parts.append(f"header_photo_base64_len: {b64_len}")
         return "\n".join(parts)
 
-    def _image_from_bytes(self, content: bytes, max_size=(860, 360)):
+    def _image_from_bytes(self, content: bytes, max_size=THUMBNAIL_SIZE):
         image = Image.open(io.BytesIO(content))
         image.thumbnail(max_size, Image.Resampling.LANCZOS)
-        return ImageTk.PhotoImage(image)
-
-    def _load_image(self, record: dict):
-        source_url = str(record.get("source_url", ""))
-        if source_url in self.image_cache:
-            return self.image_cache[source_url]
+        return image
 
-        content = None
+    def _fetch_image_bytes(self, record: dict):
         b64 = record.get("header_photo_base64")
         if b64:
             try:
-                content = base64.b64decode(b64)
+                return base64.b64decode(b64)
             except Exception:
-                content = None
-
-        if content is None:
-            photo_url = record.get("header_photo_url")
-            if photo_url:
-                try:
-                    req = urllib.request.Request(
-                        str(photo_url),
-                        headers={"User-Agent": "Mozilla/5.0"},
-                    )
-                    with urllib.request.urlopen(req, timeout=10) as response:
-                        content = response.read(6_000_000)
-                except Exception:
-                    content = None
+                pass
+
+        photo_url = record.get("header_photo_url")
+        if photo_url:
+            try:
+                req = urllib.request.Request(
+                    str(photo_url),
+                    headers={"User-Agent": "Mozilla/5.0"},
+                )
+                with urllib.request.urlopen(req, timeout=10) as response:
+                    return response.read(6_000_000)
+            except Exception:
+                return None
+        return None
+
+    def _load_image(self, idx: int):
+        # Runs on the worker pool: returns a PIL image, never touches Tk.
+        record = self.records[idx]
+        key = str(record.get("header_photo_url") or record.get("source_url") or "")
+        if self.thumb_cache is not None and key:
+            image = self.thumb_cache.load(key)
+            if image is not None:
+                return image
 
+        content = self._fetch_image_bytes(record)
         if not content:
-            self.image_cache[source_url] = None
             return None
-
         try:
             image = self._image_from_bytes(content)
         except Exception:
-            image = None
-        self.image_cache[source_url] = image
+            return None
+        if self.thumb_cache is not None and key:
+            self.thumb_cache.store(key, image)
         return image
 
+    def _request_image(self, idx: int):
+        if idx in self.image_cache or idx in self.pending_images:
+            return
+        self.pending_images.add(idx)
+        future = self.image_pool.submit(self._load_image, idx)
+        future.add_done_callback(lambda done, idx=idx: self.image_results.put((idx, done)))
+
+    def _drain_image_results(self):
+        while True:
+            try:
+                idx, future = self.image_results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending_images.discard(idx)
+            try:
+                image = future.result()
+                photo = ImageTk.PhotoImage(image) if image is not None else None
+            except Exception:
+                photo = None
+            self.image_cache[idx] = photo
+            self.image_cache.move_to_end(idx)
+            while len(self.image_cache) > self.image_cache_size:
+                self.image_cache.popitem(last=False)
+            if self._current_record_index() == idx:
+                self._show_image(photo)
+        self.root.after(IMAGE_POLL_MS, self._drain_image_results)
+
+    def _show_image(self, image):
+        if image is None:
+            self.image_label.configure(image="", text="No image")
+            self.photo_ref = None
+        else:
+            self.image_label.configure(image=image, text="")
+            self.photo_ref = image
+
+    def _current_record_index(self):
+        idx = self._current_index()
+        if idx is None:
+            return None
+        return self.view[idx]
+
+    def close(self):
+        self.image_pool.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
     def on_select(self, _event):
+        selected = self.listbox.curselection()
+        if not selected:
+            return
+        self.current = self.top + selected[0]
+        self._show_current()
+
+    def _show_current(self):
         idx = self._current_index()
         if idx is None:
             return
-        record = self.records[idx]
+        record_idx = self.view[idx]
+        record = self.records[record_idx]
 
         self.title_var.set(str(record.get("title", "")))
         self._set_text(self.meta_text, self._meta_block(record))
         self._set_text(self.article_text, str(record.get("article_text", "")))
 
-        image = self._load_image(record)
-        if image is None:
-            self.image_label.configure(image="", text="No image")
-            self.photo_ref = None
+        if record_idx in self.image_cache:
+            self.image_cache.move_to_end(record_idx)
+            self._show_image(self.image_cache[record_idx])
         else:
-            self.image_label.configure(image=image, text="")
-            self.photo_ref = image
+            self.image_label.configure(image="", text="Loading image...")
+            self.photo_ref = None
+            self._request_image(record_idx)
+
+        # Warm up the neighbours so Prev/Next usually hit the cache.
+        for neighbour in (idx + 1, idx - 1):
+            if 0 <= neighbour < len(self.view):
+                self._request_image(self.view[neighbour])
 
 
 def main():
@@ -237,12 +616,16 @@ def main():
     if not data_file.exists():
         raise SystemExit(f"File not found: {data_file}")
 
-    records = list(iter_jsonl(data_file))
-    if not records:
+    if args.lazy:
+        records = IndexedRecords(JsonlIndex(data_file))
+    else:
+        records = MemoryRecords(list(iter_jsonl(data_file)))
+    if not len(records):
         raise SystemExit("No readable JSON records found in file.")
 
     root = tk.Tk()
-    app = DataViewerApp(root, records)
+    thumb_cache = ThumbnailDiskCache(Path(args.thumb_cache)) if args.thumb_cache else None
+    app = DataViewerApp(root, records, args.image_cache_size, thumb_cache)
     # Keep reference to avoid garbage collection in some Tk implementations.
     root.app = app
     root.mainloop()